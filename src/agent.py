@@ -9,8 +9,13 @@ from botbuilder.core import MemoryStorage
 from src.config import Config
 from src.bot import GapAnalysisBot, AppState
 
-# Initialize MemoryStorage
-storage = MemoryStorage()
+# Initialize storage: Redis when configured (shared across workers/replicas,
+# survives restarts), otherwise in-memory for local dev.
+if Config.REDIS_URL:
+    from src.redis_storage import RedisStorage
+    storage = RedisStorage(Config.REDIS_URL)
+else:
+    storage = MemoryStorage()
 
 # ==========================================
 # CRITICAL FIX: TeamsAdapter Constructor
@@ -27,11 +32,21 @@ from botframework.connector.auth import (
 
 # Create credential factory DIRECTLY with explicit values
 # This is passed to TeamsAdapter via credentials_factory kwarg
-credential_factory = PasswordServiceClientCredentialFactory(
-    app_id=Config.APP_ID,
-    password=Config.APP_PASSWORD,
-    tenant_id=Config.APP_TENANT_ID  # CRITICAL for SingleTenant
-)
+#
+# Local dev gets an explicitly anonymous factory so no turn ever attempts
+# a token exchange (and the retry/backoff that comes with a failing one);
+# production wires the real credentials including the SingleTenant tenant.
+if Config.is_local_dev():
+    credential_factory = PasswordServiceClientCredentialFactory(
+        app_id="",
+        password=""
+    )
+else:
+    credential_factory = PasswordServiceClientCredentialFactory(
+        app_id=Config.APP_ID,
+        password=Config.APP_PASSWORD,
+        tenant_id=Config.APP_TENANT_ID  # CRITICAL for SingleTenant
+    )
 
 
 
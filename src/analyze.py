@@ -1,71 +1,152 @@
 """General Gap Analysis logic using Azure OpenAI."""
+import asyncio
+import hashlib
+import os
+from functools import lru_cache
+
 import tiktoken
 from .azure_openai_client import AzureOpenAIClient
+from .cache import ResultCache
+from .config import Config
 
 # Token limits
 MAX_TOKENS_FILE_UPLOAD = 70000  # 70k tokens for file uploads
 MAX_CHARS_PASTE_MODE = 21000    # 21k chars for pasted text
 
-# Universal system prompt for gap analysis
-SYSTEM_PROMPT = """You are a Gap Analysis Agent. Your task is to compare Document A (Source) against Document B (Target) based on a specific analysis objective.
+# Typical English prose runs ~4 characters per token. Exact tiktoken
+# counting is only worth its cost when the estimate lands near the limit.
+CHARS_PER_TOKEN_ESTIMATE = 4
+
+# Minimum plausible input sizes (stripped chars)
+MIN_DOC_CHARS = 20
+MIN_OBJECTIVE_CHARS = 5
+
+# Prompts estimated under this many tokens are routed to the lighter
+# deployment (when one is configured) - short comparisons don't need the
+# larger model's context or cost.
+SMALL_DEPLOYMENT_MAX_TOKENS = int(os.getenv("SMALL_DEPLOYMENT_MAX_TOKENS", "4000"))
+
+# Cap on simultaneous outbound LLM calls. Keeps a burst of analyses from
+# tripping Azure OpenAI rate limits while still letting requests overlap.
+MAX_CONCURRENT_ANALYSES = int(os.getenv("MAX_CONCURRENT_ANALYSES", "4"))
+
+_analysis_semaphore: asyncio.Semaphore = None
+
+# One AzureOpenAIClient (and its underlying HTTP connection pool) shared
+# by all requests, so TLS sessions to Azure OpenAI stay warm between calls.
+_shared_client: AzureOpenAIClient = None
+
+
+def _get_client() -> AzureOpenAIClient:
+    """Get the shared Azure OpenAI client, creating it lazily on first use."""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = AzureOpenAIClient()
+    return _shared_client
+
+# Completed analyses keyed by SHA-256 of the inputs. Identical reruns
+# (same docs, same objective) return instantly and spend zero tokens.
+# TTL matches the 24h session state lifetime: any conversation whose
+# state is still alive can replay its analysis for free.
+_result_cache = ResultCache("gap:analysis", ttl=86400)
+
+# In-flight analyses by cache key, so concurrent identical requests share
+# one LLM call instead of racing each other past the cache.
+_inflight: dict = {}
+
+
+def _normalize_for_cache(text: str) -> str:
+    """Collapse runs of whitespace so cosmetic edits don't defeat the cache."""
+    return " ".join(text.split())
+
+
+def _content_digest(text: str) -> bytes:
+    """Whitespace-insensitive SHA-256 of a document, without copying it.
 
-Input Structure:
-- "Document A" and "Document B" may each consist of a single text block or multiple files.
-- If multiple files are provided, they will be clearly marked with headers like "## File: filename".
-- Treat all content within "Document A" collectively as the "Source State".
-- Treat all content within "Document B" collectively as the "Target State" (ideal, requirements, or benchmark).
+    Feeds the hash word by word instead of materializing a normalized
+    copy of the full text - documents can be hundreds of KB and only the
+    digest is needed.
+    """
+    digest = hashlib.sha256()
+    for word in text.split():
+        digest.update(word.encode("utf-8"))
+        digest.update(b" ")
+    return digest.digest()
+
+
+def _cache_key(docA: str, docB: str, analysis_objective: str) -> str:
+    """Build a SHA-256 cache key from per-document digests plus the objective.
+
+    Each document body is hashed exactly once into a fixed-size digest;
+    the final key combines the two digests with the normalized, casefolded
+    objective ("find compliance gaps" == "Find Compliance Gaps").
+    """
+    digest = hashlib.sha256()
+    digest.update(_content_digest(docA))
+    digest.update(_content_digest(docB))
+    digest.update(_normalize_for_cache(analysis_objective).casefold().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _get_analysis_semaphore() -> asyncio.Semaphore:
+    """Get the shared LLM-call semaphore, creating it lazily on first use."""
+    global _analysis_semaphore
+    if _analysis_semaphore is None:
+        _analysis_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+    return _analysis_semaphore
 
-Core Instruction: Your primary operation is to evaluate how well Document A satisfies or aligns with the criteria, themes, and requirements explicitly stated or clearly implied in Document B, as guided by the analysis objective.
+# Universal system prompt for gap analysis.
+# Kept deliberately compact: this is resent with every request, so each
+# token here is paid on every analysis.
+SYSTEM_PROMPT = """You are a Gap Analysis Agent: compare Document A (Source) against Document B (Target) according to the stated analysis objective.
 
-Execution Rules:
+Input: A and B may each be one text block or multiple files marked "## File: filename". Treat all of A collectively as the Source State and all of B collectively as the Target State (ideal, requirements, or benchmark).
 
-Evidence & Scope
-Use only information explicitly present in Document A and Document B. Never infer, assume, or invent.
-If a key term from the analysis objective is absent from both documents, state this as a fundamental limitation before proceeding.
+Task: evaluate how well Document A satisfies the criteria, themes, and requirements explicitly stated or clearly implied in Document B, guided by the analysis objective.
 
-Gap Classification Logic
-For each relevant criterion derived from Document B and the analysis objective, apply this decision tree:
-Fully Addressed: Document A contains a direct, complete, and unambiguous match to the criterion from Document B.
-Partially Addressed: Document A addresses the criterion but is missing one of these elements: specificity, measurable detail, concrete examples, or a clear process outlined in Document B.
-Not Addressed (Gap): The criterion from Document B is not mentioned or supported by any evidence in Document A.
-Conflict / Misalignment: Document A directly contradicts a stated requirement or fact in Document B.
+Rules:
+- Evidence: use only information explicitly present in A and B; never infer, assume, or invent. If a key term from the objective is absent from both documents, state that limitation before proceeding.
+- Classification, per criterion derived from B and the objective: Fully Addressed (direct, complete, unambiguous match in A); Partially Addressed (addressed but missing specificity, measurable detail, concrete examples, or a clear process from B); Not Addressed / Gap (no supporting evidence in A); Conflict / Misalignment (A directly contradicts B).
+- Severity, judged only by impact on the objective: High (core non-negotiable requirement missing or contradicted, objective unachievable); Medium (important supporting element weak or missing, reduced effectiveness or added risk); Low (minor or nice-to-have element); Unspecified (only if the objective gives no basis to judge importance).
+- Recommendations: each must bridge directly from the cited evidence to the assigned status, and be actionable on Document A (e.g., "Add a section to Document A that..."). Never introduce unstated resources or goals, or changes to B's stated requirements.
+- Output: a logical, readable flow for an expert; make the evidence-to-status-to-recommendation link self-evident; no meta-commentary. Operate strictly within these rules and the provided text."""
 
-Severity Determination Rules
-Assign severity only by evaluating the gap's impact on the analysis objective using these anchors:
-High: A core, non-negotiable requirement from Document B is missing or contradicted in Document A, making the core objective unachievable.
-Medium: An important supporting element is missing or weak, reducing effectiveness or increasing risk for the objective.
-Low: The absence or weakness is in a minor, supplementary, or nice-to-have element.
-Unspecified: Only use this if the objective provides no context for judging importance (e.g., "list differences").
+# User prompt skeleton, assembled once. Only the three dynamic fields are
+# filled per request; the scaffolding text stays identical so the request
+# payload (and any upstream prompt caching) is byte-stable across calls.
+USER_PROMPT_TEMPLATE = (
+    "\nDocument A:\n{docA}\n\n"
+    "Document B:\n{docB}\n\n"
+    "Analysis Objective: {objective}\n"
+)
 
-Recommendation Constraints
-Every recommendation must be a direct, logical bridge from the "Evidence" cited to the "Status" assigned.
-Recommendations must be actionable on Document A (e.g., "Add a section to Document A that...", "Modify Document A's wording to explicitly state...").
-Forbidden: Introducing solutions that require new, unstated resources, goals, or fundamental changes to Document B's stated requirements.
 
-Communication Protocol
-Present your analysis in a logical, readable flow suitable for an expert.
-Show your work implicitly: Structure your response so that the link between your cited evidence, your classification, and your recommendation is self-evident.
-Omit meta-commentary (e.g., "Now I will analyze...").
-Operate strictly within these rules and the provided text."""
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """Get the tiktoken encoding for a model, cached across calls.
+
+    Building an encoder loads the BPE vocabulary, which is far more
+    expensive than the encode itself, so do it once per model.
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Fallback to cl100k_base for newer models
+        return tiktoken.get_encoding("cl100k_base")
 
 
 def count_tokens(text: str, model: str = "gpt-4") -> int:
     """
     Count tokens in text using tiktoken.
-    
+
     Args:
         text: Text to count tokens for
         model: Model name for encoding (default: gpt-4)
-        
+
     Returns:
         Number of tokens
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        # Fallback to cl100k_base for newer models
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text))
+    return len(_get_encoding(model).encode(text))
 
 
 def validate_inputs(
@@ -86,22 +167,27 @@ def validate_inputs(
     Returns:
         Tuple of (is_valid, error_message)
     """
-    if not docA or not docA.strip():
+    # Strip each input once; every presence/length check below reuses it.
+    docA_len = len(docA.strip()) if docA else 0
+    docB_len = len(docB.strip()) if docB else 0
+    objective_len = len(analysis_objective.strip()) if analysis_objective else 0
+
+    if not docA_len:
         return False, "Document A is required. Please provide the source/current document."
-    
-    if not docB or not docB.strip():
+
+    if not docB_len:
         return False, "Document B is required. Please provide the target/ideal/guardrails document."
-    
-    if not analysis_objective or not analysis_objective.strip():
+
+    if not objective_len:
         return False, "Analysis objective is required. Please describe what to analyze for."
-    
-    if len(docA.strip()) < 20:
+
+    if docA_len < MIN_DOC_CHARS:
         return False, "Document A seems too short. Please provide a complete document."
-    
-    if len(docB.strip()) < 20:
+
+    if docB_len < MIN_DOC_CHARS:
         return False, "Document B seems too short. Please provide a complete document."
-    
-    if len(analysis_objective.strip()) < 5:
+
+    if objective_len < MIN_OBJECTIVE_CHARS:
         return False, "Analysis objective is too short. Please provide a meaningful objective."
     
     # Source-specific validation
@@ -111,11 +197,19 @@ def validate_inputs(
         if total_length > MAX_CHARS_PASTE_MODE:
             return False, f"Input too long ({total_length:,} chars). Please shorten to under {MAX_CHARS_PASTE_MODE:,} characters total."
     else:
-        # File upload mode: Use token limit
-        combined_text = f"{docA}\n\n{docB}\n\n{analysis_objective}"
-        token_count = count_tokens(combined_text)
-        if token_count > MAX_TOKENS_FILE_UPLOAD:
-            return False, f"Uploaded documents exceed {MAX_TOKENS_FILE_UPLOAD:,} tokens ({token_count:,} tokens). Please remove some files to reduce content."
+        # File upload mode: Use token limit. Cheap char-based estimate
+        # first; only tokenize exactly when the estimate is near the limit.
+        combined_len = len(docA) + len(docB) + len(analysis_objective) + 4
+        estimated_tokens = combined_len // CHARS_PER_TOKEN_ESTIMATE
+        if estimated_tokens > MAX_TOKENS_FILE_UPLOAD * 3 // 2:
+            # Far over the limit even by estimate - no need to tokenize.
+            return False, f"Uploaded documents exceed {MAX_TOKENS_FILE_UPLOAD:,} tokens (roughly {estimated_tokens:,} tokens). Please remove some files to reduce content."
+        if estimated_tokens * 2 > MAX_TOKENS_FILE_UPLOAD:
+            # Near the boundary - pay for the exact count.
+            combined_text = f"{docA}\n\n{docB}\n\n{analysis_objective}"
+            token_count = count_tokens(combined_text)
+            if token_count > MAX_TOKENS_FILE_UPLOAD:
+                return False, f"Uploaded documents exceed {MAX_TOKENS_FILE_UPLOAD:,} tokens ({token_count:,} tokens). Please remove some files to reduce content."
     
     return True, ""
 
@@ -141,11 +235,53 @@ async def analyze_gap(
     is_valid, error = validate_inputs(docA, docB, analysis_objective, source)
     if not is_valid:
         raise ValueError(error)
-    
-    system_prompt = SYSTEM_PROMPT
-    user_prompt = f"""
-Document A:\n{docA}\n\nDocument B:\n{docB}\n\nAnalysis Objective: {analysis_objective}\n"""
 
-    client = AzureOpenAIClient()
-    result = await client.chat_completion(system_prompt, user_prompt)
+    cache_key = _cache_key(docA, docB, analysis_objective)
+    cached = await _result_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Coalesce identical in-flight analyses: if the same inputs are already
+    # being processed, piggyback on that call instead of paying for another.
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(
+            _run_analysis(cache_key, docA, docB, analysis_objective)
+        )
+        _inflight[cache_key] = task
+        try:
+            return await task
+        finally:
+            _inflight.pop(cache_key, None)
+    return await task
+
+
+async def _run_analysis(
+    cache_key: str, docA: str, docB: str, analysis_objective: str
+) -> str:
+    """Execute one LLM analysis under the concurrency cap and cache it."""
+    user_prompt = USER_PROMPT_TEMPLATE.format(
+        docA=docA, docB=docB, objective=analysis_objective
+    )
+
+    client = _get_client()
+    async with _get_analysis_semaphore():
+        result = await client.chat_completion(
+            SYSTEM_PROMPT, user_prompt, deployment=_pick_deployment(user_prompt)
+        )
+
+    await _result_cache.set(cache_key, result)
     return result
+
+
+def _pick_deployment(user_prompt: str) -> str:
+    """Pick a deployment for this prompt, or None for the configured default.
+
+    Uses the chars/token estimate rather than exact counting - routing only
+    needs to be roughly right, and misrouting a boundary case just means a
+    short prompt runs on the larger model.
+    """
+    small = Config.AZURE_OPENAI_DEPLOYMENT_SMALL
+    if small and len(user_prompt) // CHARS_PER_TOKEN_ESTIMATE <= SMALL_DEPLOYMENT_MAX_TOKENS:
+        return small
+    return None
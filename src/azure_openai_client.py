@@ -1,6 +1,15 @@
 """Azure OpenAI client wrapper for gap analysis."""
-# from openai import AzureOpenAI (Removed, using AsyncAzureOpenAI)
+import asyncio
+import random
+
+# Imported at module level so the one-time SDK import cost is paid at
+# startup, not inside the first user's request.
+from openai import AsyncAzureOpenAI
+
 from .config import Config
+from .logger import setup_logger
+
+LOGGER = setup_logger(__name__)
 
 
 class AzureOpenAIClient:
@@ -13,7 +22,6 @@ class AzureOpenAIClient:
                 "Set AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_KEY in .env"
             )
         
-        from openai import AsyncAzureOpenAI
         self.client = AsyncAzureOpenAI(
             azure_endpoint=Config.AZURE_OPENAI_ENDPOINT,
             api_key=Config.AZURE_OPENAI_KEY,
@@ -21,52 +29,83 @@ class AzureOpenAIClient:
         )
         self.deployment = Config.AZURE_OPENAI_DEPLOYMENT
     
-    async def chat_completion(self, system_prompt: str, user_message: str) -> str:
+    async def chat_completion(
+        self, system_prompt: str, user_message: str, deployment: str = None
+    ) -> str:
         """
         Call Azure OpenAI chat completion.
-        
+
         Args:
             system_prompt: System instructions for the model
             user_message: User input message
-            
+            deployment: Optional deployment override (defaults to the configured one)
+
         Returns:
             Model response text
         """
-        try:
-            import asyncio
-            import random
-            
-            max_retries = 3
-            base_delay = 2.0
-            
-            for attempt in range(max_retries):
-                try:
-                    response = await self.client.chat.completions.create(
-                        model=self.deployment,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_message}
-                        ],
-                        max_tokens=2000,
-                        temperature=0.1,
-                        top_p=0.95
+        deployment = deployment or self.deployment
+        max_retries = 3
+        base_delay = 2.0
+        max_delay = 20.0
+        delay = base_delay
+
+        for attempt in range(max_retries):
+            try:
+                # Stream the completion: tokens arrive as they are
+                # generated instead of after the service buffers the
+                # whole response, trimming end-to-end latency.
+                stream = await self.client.chat.completions.create(
+                    model=deployment,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_message}
+                    ],
+                    max_tokens=2000,
+                    temperature=0.1,
+                    top_p=0.95,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+
+                parts = []
+                usage = None
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+
+                if not parts:
+                    raise ValueError("Empty response from Azure OpenAI")
+
+                # The service's own accounting is authoritative - use it
+                # for token reporting instead of re-tokenizing locally.
+                if usage:
+                    LOGGER.info(
+                        f"Azure OpenAI usage: prompt={usage.prompt_tokens}, "
+                        f"completion={usage.completion_tokens}, total={usage.total_tokens}"
                     )
-                    
-                    if not response.choices:
-                        raise ValueError("Empty response from Azure OpenAI")
-                    
-                    return response.choices[0].message.content.strip()
-                    
-                except Exception as e:
-                    error_str = str(e).lower()
-                    is_rate_limit = "429" in error_str or "too many requests" in error_str
-                    is_server_error = "500" in error_str or "503" in error_str
-                    
-                    if (is_rate_limit or is_server_error) and attempt < max_retries - 1:
-                        delay = base_delay * (2 ** attempt) + random.uniform(0, 1)  # nosec B311 - not for security
-                        await asyncio.sleep(delay)
-                        continue
-                    raise e
-                    
-        except Exception as e:
-            raise RuntimeError(f"Azure OpenAI API error: {str(e)}")
+
+                content = "".join(parts)
+                # strip() copies the whole string even when it's a no-op;
+                # only pay for that on outputs that actually need trimming.
+                if content[:1].isspace() or content[-1:].isspace():
+                    content = content.strip()
+                return content
+                
+            except Exception as e:
+                error_str = str(e).lower()
+                is_rate_limit = "429" in error_str or "too many requests" in error_str
+                is_server_error = "500" in error_str or "503" in error_str
+                
+                if (is_rate_limit or is_server_error) and attempt < max_retries - 1:
+                    # Decorrelated jitter: each delay is drawn from
+                    # [base, 3*previous], capped. This spreads concurrent
+                    # retries across the window instead of letting every
+                    # throttled caller come back at the same 2/4/8s marks.
+                    delay = min(max_delay, random.uniform(base_delay, delay * 3))  # nosec B311 - not for security
+                    await asyncio.sleep(delay)
+                    continue
+                # Chain the original exception so the real traceback survives.
+                raise RuntimeError(f"Azure OpenAI API error: {e}") from e
+                
@@ -1,4 +1,6 @@
 """Gap Analysis Bot using Teams AI SDK (M365 Agents SDK)."""
+import asyncio
+import re
 from typing import List, Optional
 from dataclasses import dataclass, field
 from teams import Application
@@ -18,16 +20,85 @@ from .cards import (
     get_docB_received_card_completed,
     get_result_card,
     get_result_card_completed,
+    RESULT_CARD_TEXT_LIMIT,
     get_error_card,
     get_error_card_completed,
     get_text_input_card,
     get_text_input_card_completed,
 )
-from .analyze import analyze_gap
-from .file_handler import FileHandler
+# .analyze (tiktoken + the OpenAI SDK) and .file_handler (httpx + parsers)
+# are deliberately imported inside the handlers that need them: neither is
+# required to answer the first health probe or plain-text turn, and
+# deferring them keeps worker cold start to the bot framework itself.
 
 LOGGER = setup_logger(__name__)
 
+# Parameterless completed cards are immutable and never carry interaction
+# IDs, so one Attachment each can be reused for every card update.
+_WELCOME_COMPLETED = get_welcome_card_completed()
+_DOCA_UPLOAD_COMPLETED = get_docA_upload_card_completed()
+
+# Text commands that have dedicated handlers; the catch-all handler uses
+# this for an O(1) membership test instead of re-matching a regex per turn.
+COMMAND_WORDS = frozenset(
+    {"start", "hi", "hello", "help", "begin", "about", "status", "cancel", "reset"}
+)
+
+# Message-routing patterns, compiled once at import instead of inside
+# register_handlers. Use \s* to handle leading/trailing whitespace.
+_START_RE = re.compile(r"^\s*(start|hi|hello|help|begin)\s*$", re.IGNORECASE)
+_ABOUT_RE = re.compile(r"^\s*about\s*$", re.IGNORECASE)
+_STATUS_RE = re.compile(r"^\s*status\s*$", re.IGNORECASE)
+_RESET_RE = re.compile(r"^\s*(cancel|reset)\s*$", re.IGNORECASE)
+_CATCH_ALL_RE = re.compile(r".*", re.DOTALL)
+
+
+def _card_signature(card_type: str, card_data: dict) -> str:
+    """Stable fingerprint of a card send, for duplicate suppression.
+
+    Hashed so the session only stores a short string even when card_data
+    carries full document or result text.
+    """
+    import hashlib
+    payload = repr((card_type, sorted((card_data or {}).items())))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_CARD_ID_PLACEHOLDER = "CARD_ID_PLACEHOLDER"
+
+
+def _inject_interaction_id(node, interaction_id: str):
+    """Return a copy of a card JSON tree with the ID placeholder filled in.
+
+    Copy-on-write walk over the dict/list structure: a container is only
+    rebuilt when something beneath it actually changed, so subtrees (or
+    whole cards) without the placeholder come back as the original object
+    with zero copying. Never mutates the input, so the module-level card
+    templates in cards.py stay pristine.
+    """
+    if isinstance(node, dict):
+        rebuilt = {k: _inject_interaction_id(v, interaction_id) for k, v in node.items()}
+        if all(rebuilt[k] is v for k, v in node.items()):
+            return node
+        return rebuilt
+    if isinstance(node, list):
+        rebuilt = [_inject_interaction_id(v, interaction_id) for v in node]
+        if all(new is old for new, old in zip(rebuilt, node)):
+            return node
+        return rebuilt
+    if isinstance(node, str) and _CARD_ID_PLACEHOLDER in node:
+        return node.replace(_CARD_ID_PLACEHOLDER, interaction_id)
+    return node
+
+
+def _is_non_image(attachment) -> bool:
+    """True if an attachment is a document (not an inline image preview).
+
+    Lowercases the content type once per attachment rather than per check.
+    """
+    content_type = attachment.content_type
+    return bool(content_type) and "image" not in content_type.lower()
+
 # --- State Management ---
 
 class AppState(TurnState):
@@ -49,7 +120,7 @@ class GapAnalysisBot:
             LOGGER.info("State not found in user session. Initializing new session.")
             GapAnalysisBot._reset_session(state.user)
         else:
-            LOGGER.info(f"Retrieved existing session. State={state.user.get('state')}, LastCardID={state.user.get('last_card_id')}")
+            LOGGER.debug("Retrieved existing session. State=%s, LastCardID=%s", state.user.get("state"), state.user.get("last_card_id"))
         return state.user
 
     @staticmethod
@@ -70,30 +141,51 @@ class GapAnalysisBot:
         user_state["last_card_id"] = None
         user_state["last_card_type"] = None
         user_state["last_card_data"] = {}
+        user_state["last_card_sig"] = None
         user_state["active_card_guid"] = None # Clear validity token
 
+    @staticmethod
+    async def _start_over(context: TurnContext, session: dict):
+        """Complete the active card, reset the session, and show the welcome card.
+
+        Shared by the `start` text command and the `startOver` card action
+        so the reset sequence can't drift between the two entry points.
+        """
+        await GapAnalysisBot._complete_active_card(context, session)
+        GapAnalysisBot._reset_session(session)
+        await GapAnalysisBot._send_card(context, session, get_welcome_card(), "welcome")
+
+    @staticmethod
+    def _make_update_activity(context: TurnContext, card_id: str, attachment) -> Activity:
+        """Build the replacement activity for updating a previously sent card.
+
+        recipient and from_property are swapped relative to the inbound
+        activity because the update travels from the bot back to the user.
+        """
+        return Activity(
+            type=ActivityTypes.message,
+            id=card_id,
+            attachments=[attachment],
+            conversation=context.activity.conversation,
+            recipient=context.activity.from_property,
+            from_property=context.activity.recipient
+        )
+
     @staticmethod
     async def _complete_active_card(context: TurnContext, session: dict):
         """Helper to force-complete the active card before a reset."""
         last_id = session.get("last_card_id")
         last_type = session.get("last_card_type")
-        last_data = session.get("last_card_data", {})
         
         if last_id and last_type:
             try:
-                completed_card = GapAnalysisBot._get_completed_card_for_type(last_type, last_data)
-                update_activity = Activity(
-                    type=ActivityTypes.message,
-                    id=last_id,
-                    attachments=[completed_card],
-                    conversation=context.activity.conversation,
-                    recipient=context.activity.from_property,
-                    from_property=context.activity.recipient
+                completed_card = GapAnalysisBot._get_completed_card_for_type(last_type, session)
+                await context.update_activity(
+                    GapAnalysisBot._make_update_activity(context, last_id, completed_card)
                 )
-                await context.update_activity(update_activity)
-                LOGGER.info(f"Force-completed old card {last_id} before reset")
+                LOGGER.info("Force-completed old card %s before reset", last_id)
             except Exception as e:
-                LOGGER.info(f"Failed to complete card before reset: {e}")
+                LOGGER.info("Failed to complete card before reset: %s", e)
 
     @staticmethod
     def register_handlers(app: Application[AppState]):
@@ -101,27 +193,26 @@ class GapAnalysisBot:
         
         @app.activity(ActivityTypes.conversation_update)
         async def on_conversation_update(context: TurnContext, state: AppState):
-            LOGGER.info(f"Received conversation_update: type={context.activity.type}")
+            LOGGER.debug("Received conversation_update: type=%s", context.activity.type)
             if context.activity.members_added:
+                # Build the activity once; a team-join event can add many
+                # members and the message is identical for each of them.
+                welcome_msg = MessageFactory.text(
+                    "Welcome to the **Gap Analysis Bot**! Type **start** to begin."
+                )
                 for member in context.activity.members_added:
                     if member.id != context.activity.recipient.id:
-                        await context.send_activity(
-                            MessageFactory.text("Welcome to the **Gap Analysis Bot**! Type **start** to begin.")
-                        )
+                        await context.send_activity(welcome_msg)
             return True
 
-        import re
-        # Use \s* to handle leading/trailing whitespace
-        @app.message(re.compile(r"^\s*(start|hi|hello|help|begin)\s*$", re.IGNORECASE))
+        @app.message(_START_RE)
         async def start_command(context: TurnContext, state: AppState):
             session = GapAnalysisBot._get_session(state)
             # Fix: Complete previous card AND reset session BEFORE sending welcome
-            await GapAnalysisBot._complete_active_card(context, session)
-            GapAnalysisBot._reset_session(session)
-            await GapAnalysisBot._send_card(context, session, get_welcome_card(), "welcome")
+            await GapAnalysisBot._start_over(context, session)
             return True
 
-        @app.message(re.compile(r"^\s*about\s*$", re.IGNORECASE))
+        @app.message(_ABOUT_RE)
         async def about_command(context: TurnContext, state: AppState):
             about_text = (
                 "**General Gap Analysis Agent**\n\n"
@@ -132,14 +223,14 @@ class GapAnalysisBot:
             await context.send_activity(MessageFactory.text(about_text))
             return True
 
-        @app.message(re.compile(r"^\s*status\s*$", re.IGNORECASE))
+        @app.message(_STATUS_RE)
         async def status_command(context: TurnContext, state: AppState):
             session = GapAnalysisBot._get_session(state)
             status = f"State: {session.get('state')}\nDocA: {session.get('docA_filename') or 'None'}\nDocB: {session.get('docB_filename') or 'None'}"
             await context.send_activity(MessageFactory.text(status))
             return True
 
-        @app.message(re.compile(r"^\s*(cancel|reset)\s*$", re.IGNORECASE))
+        @app.message(_RESET_RE)
         async def reset_command(context: TurnContext, state: AppState):
             session = GapAnalysisBot._get_session(state)
             await GapAnalysisBot._complete_active_card(context, session)
@@ -147,13 +238,13 @@ class GapAnalysisBot:
             await context.send_activity(MessageFactory.text("Session reset. Type **start** to begin."))
             return True
 
-        @app.message(re.compile(r".*", re.DOTALL))
+        @app.message(_CATCH_ALL_RE)
         async def catch_all(context: TurnContext, state: AppState):
             text = context.activity.text or ""
             session = GapAnalysisBot._get_session(state)
             
             # Simple check to avoid double handling if regex failed slightly but intended as command
-            if re.match(r"^\s*(start|hi|hello|help|begin|about|status|cancel|reset)\s*$", text, re.IGNORECASE):
+            if text.strip().lower() in COMMAND_WORDS:
                  return True
 
             # 1. Handle Adaptive Card submissions first (they often have no text)
@@ -165,18 +256,20 @@ class GapAnalysisBot:
                 
                 # If either is missing, or they don't match, reject it.
                 if not card_id or not valid_guid or card_id != valid_guid:
-                    LOGGER.info(f"Ignoring stale/invalid card submission. Received: {card_id}, Expected: {valid_guid}")
+                    LOGGER.info("Ignoring stale/invalid card submission. Received: %s, Expected: %s", card_id, valid_guid)
                     return True
                 
                 await GapAnalysisBot._handle_card_submit(context, state)
                 return True
             
-            # 2. Handle file attachments
-            attachments = context.activity.attachments or []
-            file_attachments = [a for a in attachments if a.content_type and 'image' not in a.content_type.lower()]
-            if file_attachments:
-                await GapAnalysisBot._handle_file_attachments(context, state, file_attachments)
-                return True
+            # 2. Handle file attachments. Most turns carry none, so bail out
+            # before building the filtered list at all.
+            attachments = context.activity.attachments
+            if attachments:
+                file_attachments = [a for a in attachments if _is_non_image(a)]
+                if file_attachments:
+                    await GapAnalysisBot._handle_file_attachments(context, state, file_attachments)
+                    return True
 
             # 3. Default fallback for unmatched text
             if not text:
@@ -190,105 +283,161 @@ class GapAnalysisBot:
             await GapAnalysisBot._send_card(context, session, get_welcome_card(), "welcome")
             return True
 
+    # card_type -> completed-card builder, replacing the old if/elif walk.
+    # Each entry takes the session and renders from its canonical fields;
+    # only values with no canonical home (result text, error message) come
+    # from the trimmed last_card_data dict (see _PERSISTED_CARD_KEYS).
+    _COMPLETED_CARD_BUILDERS = {
+        "welcome": lambda s: _WELCOME_COMPLETED,
+        "docA_upload": lambda s: _DOCA_UPLOAD_COMPLETED,
+        "docA_received": lambda s: get_docA_received_card_completed(s.get("docA_filename", "")),
+        "docB_received": lambda s: get_docB_received_card_completed(s.get("docB_filename", ""), s.get("analysis_objective", "")),
+        "text_input": lambda s: get_text_input_card_completed(s.get("docA_text", ""), s.get("docB_text", ""), s.get("analysis_objective", "")),
+        "result": lambda s: get_result_card_completed((s.get("last_card_data") or {}).get("result", ""), s.get("docA_filename", ""), [s.get("docB_filename", "")]),
+        "error": lambda s: get_error_card_completed((s.get("last_card_data") or {}).get("message", "")),
+    }
+
+    # Card fields worth persisting in last_card_data: everything else the
+    # completed builders need is already a canonical session field, so
+    # storing it again just doubles what the SDK serializes every turn.
+    _PERSISTED_CARD_KEYS = {"result": ("result",), "error": ("message",)}
+
     @staticmethod
-    def _get_completed_card_for_type(card_type: str, card_data: dict):
-        if card_type == "welcome": return get_welcome_card_completed()
-        if card_type == "docA_upload": return get_docA_upload_card_completed()
-        if card_type == "docA_received": return get_docA_received_card_completed(card_data.get("filename", ""))
-        if card_type == "docB_received": return get_docB_received_card_completed(card_data.get("filename", ""), card_data.get("objective", ""))
-        if card_type == "text_input":
-            return get_text_input_card_completed(card_data.get("docA", ""), card_data.get("docB", ""), card_data.get("objective", ""))
-        if card_type == "result":
-            return get_result_card_completed(card_data.get("result", ""), card_data.get("docA_name", ""), card_data.get("docB_names", []))
-        if card_type == "error": return get_error_card_completed(card_data.get("message", ""))
-        return get_welcome_card_completed()
+    def _get_completed_card_for_type(card_type: str, session: dict):
+        builder = GapAnalysisBot._COMPLETED_CARD_BUILDERS.get(card_type)
+        if builder is None:
+            return _WELCOME_COMPLETED
+        return builder(session)
 
     @staticmethod
     async def _send_card(context: TurnContext, session: dict, card_attachment, card_type: str, card_data: dict = None):
-        import uuid
-        import json
-        
-        # Generate a unique ID for this card interaction to prevent stale clicks
-        interaction_id = str(uuid.uuid4())
-        
-        # Inject the interaction ID into the card actions
-        # Note: This limits us to hacking the JSON, but it's the most reliable way 
-        # given we use static card definitions.
+        # Re-sending the exact same card (e.g. "start" typed twice) would
+        # just replace it with itself plus an update_activity round trip;
+        # keep the one already on screen instead. Its GUID stays active,
+        # so its buttons keep working.
+        new_sig = _card_signature(card_type, card_data)
+        if new_sig == session.get("last_card_sig") and session.get("last_card_id"):
+            LOGGER.info("Skipping duplicate %s card send", card_type)
+            return
+
+        # Generate a unique ID for this card interaction to prevent stale
+        # clicks. IDs only need to be unique within this session, so one
+        # random prefix per session plus a counter replaces a fresh uuid4
+        # (an os.urandom syscall plus formatting) on every send.
+        prefix = session.get("card_id_prefix")
+        if not prefix:
+            import uuid
+            prefix = uuid.uuid4().hex
+            session["card_id_prefix"] = prefix
+        seq = session.get("card_seq", 0) + 1
+        session["card_seq"] = seq
+        interaction_id = f"{prefix}-{seq}"
+
+        # Inject the interaction ID into the card actions via a direct tree
+        # walk; the shared template behind the attachment is left untouched.
         if hasattr(card_attachment, 'content') and isinstance(card_attachment.content, dict):
-            # Deep replace placeholder
-            card_json_str = json.dumps(card_attachment.content)
-            card_json_str = card_json_str.replace("CARD_ID_PLACEHOLDER", interaction_id)
-            card_attachment.content = json.loads(card_json_str)
+            card_attachment.content = _inject_interaction_id(
+                card_attachment.content, interaction_id
+            )
 
         last_id = session.get("last_card_id")
         last_type = session.get("last_card_type")
-        
-        if last_id and last_type:
+
+        async def _complete_old_card():
+            """Best-effort completion of the previous card."""
+            if not (last_id and last_type):
+                LOGGER.debug("Skipping card update. LastID=%s, LastType=%s", last_id, last_type)
+                return
             try:
-                completed_card = GapAnalysisBot._get_completed_card_for_type(last_type, session.get("last_card_data") or {})
-                # Explicitly set conversation and other fields for update to ensure better compat
-                update_activity = Activity(
-                    type=ActivityTypes.message,
-                    id=last_id,
-                    attachments=[completed_card],
-                    conversation=context.activity.conversation,
-                    recipient=context.activity.from_property,
-                    from_property=context.activity.recipient
+                completed_card = GapAnalysisBot._get_completed_card_for_type(last_type, session)
+                await context.update_activity(
+                    GapAnalysisBot._make_update_activity(context, last_id, completed_card)
                 )
-                await context.update_activity(update_activity)
-                LOGGER.info(f"Updated old card {last_id} ({last_type}) to completed state")
+                LOGGER.debug("Updated old card %s (%s) to completed state", last_id, last_type)
             except Exception as e:
                 # Update might fail if the card was already updated or channel doesn't support it
-                LOGGER.info(f"Best-effort update of old card failed (non-critical): {e}") 
-        else:
-             LOGGER.info(f"Skipping card update. LastID={last_id}, LastType={last_type}")
-        
-        # Update session with NEW GUID only after old card is handled
+                LOGGER.info("Best-effort update of old card failed (non-critical): %s", e)
+
+        # New GUID becomes active before either activity goes out; the old
+        # card's update and the new card's send are independent, so overlap
+        # them instead of paying two sequential service round trips.
         session["active_card_guid"] = interaction_id
-        
-        response = await context.send_activity(MessageFactory.attachment(card_attachment))
+
+        _, response = await asyncio.gather(
+            _complete_old_card(),
+            context.send_activity(MessageFactory.attachment(card_attachment))
+        )
         if response and response.id:
             session["last_card_id"] = response.id
             session["last_card_type"] = card_type
-            session["last_card_data"] = card_data or {}
-            LOGGER.info(f"New card sent and tracked: type={card_type}, id={response.id}")
+            keep = GapAnalysisBot._PERSISTED_CARD_KEYS.get(card_type, ())
+            session["last_card_data"] = {k: (card_data or {}).get(k, "") for k in keep}
+            session["last_card_sig"] = new_sig
+            LOGGER.debug("New card sent and tracked: type=%s, id=%s", card_type, response.id)
         else:
-            LOGGER.warning(f"New card sent but NO ID returned. Replacement will not work next turn. Response={response}")
+            LOGGER.warning("New card sent but NO ID returned. Replacement will not work next turn. Response=%s", response)
 
     @staticmethod
     async def _handle_card_submit(context: TurnContext, state: AppState):
         value = context.activity.value or {}
         action = value.get("action", "")
+        # Resolve the session once here and thread it through; re-running
+        # _get_session per helper repeats lookups and log formatting.
         session = GapAnalysisBot._get_session(state)
-        
-        if action == "uploadDocs":
-            session["state"] = "waiting_docA"
-            await GapAnalysisBot._send_card(context, session, get_docA_upload_card(), "docA_upload")
-        elif action == "pasteText":
-            await GapAnalysisBot._send_card(context, session, get_text_input_card(session.get("docA_text"), session.get("docB_text"), session.get("analysis_objective")), "text_input", {"docA": session.get("docA_text"), "docB": session.get("docB_text"), "objective": session.get("analysis_objective")})
-        elif action == "analyzeText":
-            await GapAnalysisBot._handle_text_analysis(context, state, value)
-        elif action == "analyzeFiles":
-            objective = value.get("analysisObjective", "").strip()
-            session["analysis_objective"] = objective or "Compare Source against Target documents"
-            await GapAnalysisBot._run_analysis(context, state)
-        elif action == "docB_received":
-            # Re-send the objective prompt (Change Objective button)
-            await GapAnalysisBot._send_card(context, session, get_docB_received_card(session.get("docB_filename"), session.get("analysis_objective")), "docB_received", {"filename": session.get("docB_filename"), "objective": session.get("analysis_objective")})
-        elif action == "startOver":
-            await GapAnalysisBot._complete_active_card(context, session)
-            GapAnalysisBot._reset_session(session)
-            await GapAnalysisBot._send_card(context, session, get_welcome_card(), "welcome")
-        else:
-            await GapAnalysisBot._send_card(context, session, get_welcome_card(), "welcome")
+        # Dict dispatch instead of an if/elif chain; unknown actions fall
+        # back to re-showing the welcome card, as before.
+        handler = GapAnalysisBot._CARD_ACTION_HANDLERS.get(
+            action, GapAnalysisBot._action_default
+        )
+        await handler(context, session, value)
 
     @staticmethod
-    async def _handle_text_analysis(context: TurnContext, state: AppState, value: dict):
-        session = GapAnalysisBot._get_session(state)
+    async def _action_upload_docs(context: TurnContext, session: dict, value: dict):
+        session["state"] = "waiting_docA"
+        await GapAnalysisBot._send_card(context, session, get_docA_upload_card(), "docA_upload")
+
+    @staticmethod
+    async def _action_paste_text(context: TurnContext, session: dict, value: dict):
+        await GapAnalysisBot._send_card(context, session, get_text_input_card(session.get("docA_text"), session.get("docB_text"), session.get("analysis_objective")), "text_input", {"docA": session.get("docA_text"), "docB": session.get("docB_text"), "objective": session.get("analysis_objective")})
+
+    @staticmethod
+    async def _action_analyze_text(context: TurnContext, session: dict, value: dict):
+        await GapAnalysisBot._handle_text_analysis(context, session, value)
+
+    @staticmethod
+    async def _action_analyze_files(context: TurnContext, session: dict, value: dict):
+        objective = value.get("analysisObjective", "").strip()
+        session["analysis_objective"] = objective or "Compare Source against Target documents"
+        await GapAnalysisBot._run_analysis(context, session)
+
+    @staticmethod
+    async def _action_docB_received(context: TurnContext, session: dict, value: dict):
+        # Re-send the objective prompt (Change Objective button)
+        await GapAnalysisBot._send_card(context, session, get_docB_received_card(session.get("docB_filename"), session.get("analysis_objective")), "docB_received", {"filename": session.get("docB_filename"), "objective": session.get("analysis_objective")})
+
+    @staticmethod
+    async def _action_start_over(context: TurnContext, session: dict, value: dict):
+        await GapAnalysisBot._start_over(context, session)
+
+    @staticmethod
+    async def _action_default(context: TurnContext, session: dict, value: dict):
+        await GapAnalysisBot._send_card(context, session, get_welcome_card(), "welcome")
+
+    @staticmethod
+    async def _handle_text_analysis(context: TurnContext, session: dict, value: dict):
+        from .analyze import validate_inputs
+
         docA = value.get("docA", "").strip()
         docB = value.get("docB", "").strip()
         analysis_objective = value.get("analysisObjective", "").strip()
-        
+
+        # Validate before touching the session so a bad submission doesn't
+        # clobber previously-captured documents or card tracking.
+        is_valid, error = validate_inputs(docA, docB, analysis_objective, source="paste")
+        if not is_valid:
+            await GapAnalysisBot._send_card(context, session, get_error_card(error), "error", {"message": error})
+            return
+
         session["input_source"] = "paste"
         session["docA_text"] = docA
         session["docA_filename"] = "Pasted Document A"
@@ -309,24 +458,18 @@ class GapAnalysisBot:
             try:
                 # Use current submitted data for completion state
                 completed_card = get_text_input_card_completed(docA, docB, analysis_objective)
-                update_activity = Activity(
-                    type=ActivityTypes.message,
-                    id=last_id,
-                    attachments=[completed_card],
-                    conversation=context.activity.conversation,
-                    recipient=context.activity.from_property,
-                    from_property=context.activity.recipient
+                await context.update_activity(
+                    GapAnalysisBot._make_update_activity(context, last_id, completed_card)
                 )
-                await context.update_activity(update_activity)
-                LOGGER.info(f"Immediate update of Input Card {last_id} successful")
+                LOGGER.debug("Immediate update of Input Card %s successful", last_id)
             except Exception as e:
-                LOGGER.warning(f"Immediate update of Input Card failed: {e}")
+                LOGGER.warning("Immediate update of Input Card failed: %s", e)
         
         # Clear last_card_id so _send_card (called later) doesn't try to update it again
         session["last_card_id"] = None
         session["last_card_type"] = None
         
-        await GapAnalysisBot._run_analysis(context, state)
+        await GapAnalysisBot._run_analysis(context, session)
 
     @staticmethod
     async def _handle_file_attachments(context: TurnContext, state: AppState, attachments: list):
@@ -334,39 +477,62 @@ class GapAnalysisBot:
         if session.get("state") == "idle": session["state"] = "waiting_docA"
         session["input_source"] = "file"
         
-        current_state = session.get("state")
-        if current_state == "waiting_docA":
-            await GapAnalysisBot._process_docA_upload(context, state, attachments)
-        elif current_state == "waiting_docB":
-            await GapAnalysisBot._process_docB_upload(context, state, attachments)
+        # Fire the typing indicator without waiting on it, so the user gets
+        # immediate feedback while the downloads/extraction run.
+        typing_task = asyncio.create_task(
+            context.send_activity(Activity(type=ActivityTypes.typing))
+        )
+        try:
+            current_state = session.get("state")
+            if current_state == "waiting_docA":
+                await GapAnalysisBot._process_docA_upload(context, session, attachments)
+            elif current_state == "waiting_docB":
+                await GapAnalysisBot._process_docB_upload(context, session, attachments)
+        finally:
+            await typing_task
 
     @staticmethod
-    async def _process_docA_upload(context: TurnContext, state: AppState, attachments: list):
-        session = GapAnalysisBot._get_session(state)
+    async def _process_docA_upload(context: TurnContext, session: dict, attachments: list):
+        from .file_handler import FileHandler
+
         processed = []
         
         limit = 10 # Using 10 as default if MAX_DOCA_FILES not defined
-        
-        for attachment in attachments[:limit]:
-            filename = attachment.name or "document_a"
-            if not FileHandler.is_supported(filename): continue
-            try:
+
+        # Same concurrent download/extract pattern as _process_docB_upload:
+        # N network-bound fetches cost roughly one, not N.
+        candidates = [
+            (attachment.name or "document_a", attachment.content_url)
+            for attachment in attachments[:limit]
+            if FileHandler.is_supported(attachment.name or "document_a")
+        ]
+        results = await asyncio.gather(
+            *[
                 # Use bot credentials for SharePoint file downloads
-                text = await FileHandler.process_attachment_with_bot_credentials(
-                    attachment.content_url, filename
-                )
-                session["docA_texts"].append(text)
-                session["docA_filenames"].append(filename)
-                processed.append(filename)
-            except Exception as e:
-                LOGGER.error(f"Error processing {filename}: {e}")
+                FileHandler.process_attachment_with_bot_credentials(url, filename)
+                for filename, url in candidates
+            ],
+            return_exceptions=True
+        )
+        for (filename, _), result in zip(candidates, results):
+            if isinstance(result, Exception):
+                LOGGER.error("Error processing %s: %s", filename, result)
+                continue
+            session["docA_texts"].append(result)
+            session["docA_filenames"].append(filename)
+            processed.append(filename)
         
         if not processed:
             error_msg = "No valid files were processed. Please try again with PDF, Word, or Text files."
             await GapAnalysisBot._send_card(context, session, get_error_card(error_msg), "error", {"message": error_msg})
             return
         
-        session["docA_text"] = "\n\n".join([f"## File: {n}\n{t}" for n, t in zip(session["docA_filenames"], session["docA_texts"])])
+        session["docA_text"] = "\n\n".join(
+            f"## File: {n}\n{t}" for n, t in zip(session["docA_filenames"], session["docA_texts"])
+        )
+        # The joined string is what analysis consumes; dropping the per-file
+        # copies halves what this session keeps alive (and persists).
+        session["docA_texts"] = []
         session["docA_filename"] = processed[0] if len(processed) == 1 else f"{len(processed)} File(s)"
         session["state"] = "waiting_docB"
         
@@ -375,30 +541,53 @@ class GapAnalysisBot:
         await GapAnalysisBot._send_card(context, session, get_docA_received_card(session["docA_filename"]), "docA_received", {"filename": session["docA_filename"]})
 
     @staticmethod
-    async def _process_docB_upload(context: TurnContext, state: AppState, attachments: list):
-        session = GapAnalysisBot._get_session(state)
+    async def _process_docB_upload(context: TurnContext, session: dict, attachments: list):
+        from .file_handler import FileHandler
+
         processed = []
         
-        for attachment in attachments[:GapAnalysisBot.MAX_DOCB_FILES]:
-            filename = attachment.name or "document_b"
-            if not FileHandler.is_supported(filename): continue
-            try:
+        # Download/extract all files concurrently - each download is
+        # network-bound, so N files cost roughly one download, not N.
+        candidates = [
+            (attachment.name or "document_b", attachment.content_url)
+            for attachment in attachments[:GapAnalysisBot.MAX_DOCB_FILES]
+            if FileHandler.is_supported(attachment.name or "document_b")
+        ]
+        results = await asyncio.gather(
+            *[
                 # Use bot credentials for SharePoint file downloads
-                text = await FileHandler.process_attachment_with_bot_credentials(
-                    attachment.content_url, filename
-                )
-                session["docB_texts"].append(text)
-                session["docB_filenames"].append(filename)
-                processed.append(filename)
-            except Exception as e:
-                LOGGER.error(f"Error processing {filename}: {e}")
-        
+                FileHandler.process_attachment_with_bot_credentials(url, filename)
+                for filename, url in candidates
+            ],
+            return_exceptions=True
+        )
+        # Accumulate locally and touch the session once; per-iteration
+        # writes into the tracked state dict are wasted work for failures.
+        texts = []
+        for (filename, _), result in zip(candidates, results):
+            if isinstance(result, Exception):
+                LOGGER.error("Error processing %s: %s", filename, result)
+                continue
+            texts.append(result)
+            processed.append(filename)
+        session["docB_filenames"].extend(processed)
+
         if not processed:
             error_msg = "No valid files were processed. Please try again."
             await GapAnalysisBot._send_card(context, session, get_error_card(error_msg), "error", {"message": error_msg})
             return
-        
-        session["docB_text"] = "\n\n".join([f"## File: {n}\n{t}" for n, t in zip(session["docB_filenames"], session["docB_texts"])])
+
+        # Fold the new files straight into the joined document instead of
+        # keeping per-file copies in the session: only the joined string is
+        # consumed downstream, and dropping the list halves what this
+        # session keeps alive (and persists). A later upload in the same
+        # turn sequence appends to the existing joined text.
+        new_block = "\n\n".join(
+            f"## File: {n}\n{t}" for n, t in zip(processed, texts)
+        )
+        existing = session.get("docB_text")
+        session["docB_text"] = f"{existing}\n\n{new_block}" if existing else new_block
+        session["docB_texts"] = []
         session["docB_filename"] = f"{len(session['docB_filenames'])} File(s)"
         
         # Send confirmation card and ask for objective
@@ -410,12 +599,31 @@ class GapAnalysisBot:
             {"filename": session["docB_filename"], "objective": session.get("analysis_objective", "")}
         )
 
+    # Teams drops the typing indicator after a few seconds; re-emit under
+    # that window so it stays visible for the whole analysis.
+    TYPING_PING_INTERVAL = 3.5
+
     @staticmethod
-    async def _run_analysis(context: TurnContext, state: AppState):
-        session = GapAnalysisBot._get_session(state)
-        await context.send_activity(Activity(type=ActivityTypes.typing))
+    async def _keep_typing(context: TurnContext):
+        """Re-send the typing indicator until cancelled."""
+        while True:
+            await context.send_activity(Activity(type=ActivityTypes.typing))
+            await asyncio.sleep(GapAnalysisBot.TYPING_PING_INTERVAL)
+
+    @staticmethod
+    async def _run_analysis(context: TurnContext, session: dict):
+        from .analyze import analyze_gap
+
+        # A long analysis can run tens of seconds; a single typing ping
+        # would expire and leave the client looking stalled, so keep
+        # pinging in the background until the analysis settles.
+        typing_task = asyncio.create_task(GapAnalysisBot._keep_typing(context))
         try:
-            analysis_result = await analyze_gap(session.get("docA_text"), session.get("docB_text"), session.get("analysis_objective"), source=session.get("input_source"))
+            try:
+                analysis_result = await analyze_gap(session.get("docA_text"), session.get("docB_text"), session.get("analysis_objective"), source=session.get("input_source"))
+            finally:
+                # Stop pinging before any card goes out, on error paths too.
+                typing_task.cancel()
             await GapAnalysisBot._send_card(
                 context, 
                 session, 
@@ -423,11 +631,33 @@ class GapAnalysisBot:
                 "result", 
                 {"result": analysis_result, "docA_name": session.get("docA_filename"), "docB_names": [session.get("docB_filename")], "source": session.get("input_source")}
             )
+            # The card truncates very long analyses to stay under the Teams
+            # card payload ceiling; deliver the remainder as plain text so
+            # nothing is lost.
+            if len(analysis_result) > RESULT_CARD_TEXT_LIMIT:
+                await context.send_activity(
+                    MessageFactory.text(
+                        "**Analysis (continued)**\n\n"
+                        + analysis_result[RESULT_CARD_TEXT_LIMIT:]
+                    )
+                )
         except ValueError as e:
 
             error_msg = str(e)
             await GapAnalysisBot._send_card(context, session, get_error_card(error_msg), "error", {"message": error_msg})
         except Exception as e:
-            LOGGER.error(f"Analysis error: {e}", exc_info=True)
+            LOGGER.error("Analysis error: %s", e, exc_info=True)
             error_msg = f"Analysis failed: {str(e)}"
             await GapAnalysisBot._send_card(context, session, get_error_card(error_msg), "error", {"message": error_msg})
+
+
+# Card action dispatch table. Bound after the class body so the handler
+# references resolve; lookup replaces the old if/elif chain per submit.
+GapAnalysisBot._CARD_ACTION_HANDLERS = {
+    "uploadDocs": GapAnalysisBot._action_upload_docs,
+    "pasteText": GapAnalysisBot._action_paste_text,
+    "analyzeText": GapAnalysisBot._action_analyze_text,
+    "analyzeFiles": GapAnalysisBot._action_analyze_files,
+    "docB_received": GapAnalysisBot._action_docB_received,
+    "startOver": GapAnalysisBot._action_start_over,
+}
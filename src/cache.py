@@ -0,0 +1,83 @@
+"""Async result cache for expensive operations (LLM calls, file extraction).
+
+Backed by Redis when REDIS_URL is configured so cache hits are shared
+across workers and replicas; otherwise a bounded in-memory dict keeps the
+same semantics for single-process local dev. Cache failures never break
+the caller - they just mean a miss.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .config import Config
+from .logger import setup_logger
+
+LOGGER = setup_logger(__name__)
+
+DEFAULT_TTL_SECONDS = 3600
+MAX_MEMORY_ENTRIES = 256
+
+
+class ResultCache:
+    """Simple async string cache with TTL and a namespacing key prefix."""
+
+    def __init__(self, prefix: str, ttl: int = DEFAULT_TTL_SECONDS):
+        self._prefix = prefix
+        self._ttl = ttl
+        self._redis = None
+        self._redis_failed = False
+        # In-memory fallback: key -> (expires_at, value), LRU-evicted
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _get_redis(self):
+        """Get the Redis client if configured and importable, else None."""
+        if self._redis_failed or not Config.REDIS_URL:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(Config.REDIS_URL)
+            except ImportError:
+                self._redis_failed = True
+                return None
+        return self._redis
+
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on miss/error."""
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                value = await redis.get(self._key(key))
+                return value.decode("utf-8") if value is not None else None
+            except Exception as e:
+                LOGGER.warning(f"Cache read failed (treating as miss): {e}")
+                return None
+
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str):
+        """Store value under key with this cache's TTL. Best-effort."""
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                await redis.set(self._key(key), value.encode("utf-8"), ex=self._ttl)
+                return
+            except Exception as e:
+                LOGGER.warning(f"Cache write failed (skipping): {e}")
+                return
+
+        self._memory[key] = (time.monotonic() + self._ttl, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > MAX_MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
@@ -5,20 +5,40 @@ UI/UX Design Principles:
 - Completed cards show SAME content as original, just without buttons
 - Teams payload safe (< 28KB total)
 """
+from functools import lru_cache
+
 from botbuilder.core import CardFactory
 from botbuilder.schema import Attachment
 
 
+# Header keys shared by every card; spread into each builder instead of
+# re-allocating the three literals per call.
+_CARD_HEADER = {
+    "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+    "type": "AdaptiveCard",
+    "version": "1.4",
+}
+
+
+def _strip_actions(card: dict) -> dict:
+    """Completed variant of a card dict: same content, actions removed.
+
+    Shallow clone - the body subtree is shared with the active card, which
+    is safe because card content is never mutated in place (the bot's
+    placeholder injection is copy-on-write).
+    """
+    return {k: v for k, v in card.items() if k != "actions"}
+
+
 # =============================================================================
 # ACTIVE CARDS (with buttons)
 # =============================================================================
 
-def get_welcome_card() -> Attachment:
-    """Create the welcome card with instructions."""
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
+# Static card bodies are built once at import. The getters still return a
+# fresh Attachment per call; _send_card replaces the content wholesale when
+# injecting the interaction ID, so the shared template dict is never mutated.
+_WELCOME_CARD = {
+        **_CARD_HEADER,
         "body": [
             {
                 "type": "TextBlock",
@@ -71,15 +91,15 @@ def get_welcome_card() -> Attachment:
             }
         ]
     }
-    return CardFactory.adaptive_card(card)
 
 
-def get_docA_upload_card() -> Attachment:
-    """Card prompting user to upload Document A file."""
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
+def get_welcome_card() -> Attachment:
+    """Create the welcome card with instructions."""
+    return CardFactory.adaptive_card(_WELCOME_CARD)
+
+
+_DOCA_UPLOAD_CARD = {
+        **_CARD_HEADER,
         "body": [
             {
                 "type": "TextBlock",
@@ -110,20 +130,30 @@ def get_docA_upload_card() -> Attachment:
             }
         ]
     }
-    return CardFactory.adaptive_card(card)
+
+
+def get_docA_upload_card() -> Attachment:
+    """Card prompting user to upload Document A file."""
+    return CardFactory.adaptive_card(_DOCA_UPLOAD_CARD)
+
+
+# Per-field character budget that keeps cards under the ~28KB Teams
+# payload limit.
+_CARD_TEXT_LIMIT = 5000
+
+
+def _truncate_for_card(text: str, limit: int = _CARD_TEXT_LIMIT) -> str:
+    """Trim text for card display; returns the original object when it fits."""
+    return text if len(text) <= limit else text[:limit] + "..."
 
 
 def get_text_input_card(docA: str = "", docB: str = "", objective: str = "") -> Attachment:
     """Card with text input fields for documents and analysis objective."""
-    # Truncate values to avoid hitting Adaptive Card size limits (approx 28KB)
-    # 5000 chars each for A/B is a safe limit.
-    safe_docA = (docA[:5000] + "...") if len(docA) > 5000 else docA
-    safe_docB = (docB[:5000] + "...") if len(docB) > 5000 else docB
+    safe_docA = _truncate_for_card(docA)
+    safe_docB = _truncate_for_card(docB)
     
     card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
+        **_CARD_HEADER,
         "body": [
             {
                 "type": "TextBlock",
@@ -193,12 +223,16 @@ def get_text_input_card(docA: str = "", docB: str = "", objective: str = "") ->
 
 
 
-def get_docA_received_card(filename: str) -> Attachment:
-    """Card confirming Document A received and asking for Document B."""
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
+@lru_cache(maxsize=256)
+def _docA_received_card_dict(filename: str) -> dict:
+    """Card dict confirming Document A received; shared by both variants.
+
+    Cached per filename: the dict is safe to share because card content is
+    never mutated (placeholder injection is copy-on-write), and each getter
+    wraps it in a fresh Attachment.
+    """
+    return {
+        **_CARD_HEADER,
         "body": [
             {
                 "type": "TextBlock",
@@ -210,7 +244,7 @@ def get_docA_received_card(filename: str) -> Attachment:
             },
             {
                 "type": "TextBlock",
-                "text": f"File: {filename}",
+                "text": "File: " + filename,
                 "wrap": True,
                 "spacing": "Small"
             },
@@ -237,15 +271,18 @@ def get_docA_received_card(filename: str) -> Attachment:
             }
         ]
     }
-    return CardFactory.adaptive_card(card)
 
 
-def get_docB_received_card(filename: str, objective: str = "") -> Attachment:
-    """Card confirming Document B received and asking for Analysis Objective."""
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
+def get_docA_received_card(filename: str) -> Attachment:
+    """Card confirming Document A received and asking for Document B."""
+    return CardFactory.adaptive_card(_docA_received_card_dict(filename))
+
+
+@lru_cache(maxsize=256)
+def _docB_received_card_dict(filename: str, objective: str = "") -> dict:
+    """Card dict confirming Document B received; cached like its docA twin."""
+    return {
+        **_CARD_HEADER,
         "body": [
             {
                 "type": "TextBlock",
@@ -257,7 +294,7 @@ def get_docB_received_card(filename: str, objective: str = "") -> Attachment:
             },
             {
                 "type": "TextBlock",
-                "text": f"File: {filename}",
+                "text": "File: " + filename,
                 "wrap": True,
                 "spacing": "Small"
             },
@@ -291,41 +328,71 @@ def get_docB_received_card(filename: str, objective: str = "") -> Attachment:
             }
         ]
     }
-    return CardFactory.adaptive_card(card)
 
 
+def get_docB_received_card(filename: str, objective: str = "") -> Attachment:
+    """Card confirming Document B received and asking for Analysis Objective."""
+    return CardFactory.adaptive_card(_docB_received_card_dict(filename, objective))
+
+
+
+# Analysis-text budget for the result card. Teams rejects card payloads
+# around 28 KB; this leaves headroom for the card scaffolding. The bot
+# sends anything beyond the budget as a follow-up message.
+RESULT_CARD_TEXT_LIMIT = 20000
+
+# Static blocks of the result card, shared by both variants; only the
+# FactSet and the analysis text differ per call.
+_RESULT_TITLE_BLOCK = {
+    "type": "TextBlock",
+    "text": "Gap Analysis Results",
+    "weight": "Bolder",
+    "size": "Large",
+    "wrap": True
+}
+
+_RESULT_DIVIDER_BLOCK = {
+    "type": "TextBlock",
+    "text": "---",
+    "spacing": "Small"
+}
+
+
+def _result_card_body(analysis_result: str, docA_name: str, docB_names: list, factset_spacing: str = None) -> list:
+    """Result card body, shared by the active and completed variants."""
+    # Dominant case is a single combined name; skip the join for it.
+    if not docB_names:
+        docB_display = "Document B"
+    elif len(docB_names) == 1:
+        docB_display = docB_names[0]
+    else:
+        docB_display = ", ".join(docB_names)
 
-def get_result_card(analysis_result: str, docA_name: str, docB_names: list, source: str = "paste") -> Attachment:
-    """Create the results Adaptive Card."""
-    docB_display = ", ".join(docB_names) if docB_names else "Document B"
-    
-    body = [
-        {
-            "type": "TextBlock",
-            "text": "Gap Analysis Results",
-            "weight": "Bolder",
-            "size": "Large",
-            "wrap": True
-        },
-        {
-            "type": "FactSet",
-            "facts": [
-                {"title": "Source (A):", "value": docA_name},
-                {"title": "Target (B):", "value": docB_display}
-            ]
-        },
-        {
-            "type": "TextBlock",
-            "text": "---",
-            "spacing": "Small"
-        },
+    factset = {
+        "type": "FactSet",
+        "facts": [
+            {"title": "Source (A):", "value": docA_name},
+            {"title": "Target (B):", "value": docB_display}
+        ]
+    }
+    if factset_spacing:
+        factset["spacing"] = factset_spacing
+    return [
+        _RESULT_TITLE_BLOCK,
+        factset,
+        _RESULT_DIVIDER_BLOCK,
         {
             "type": "TextBlock",
-            "text": analysis_result,
+            "text": _truncate_for_card(analysis_result, RESULT_CARD_TEXT_LIMIT),
             "wrap": True,
             "spacing": "Small"
         }
     ]
+
+
+def get_result_card(analysis_result: str, docA_name: str, docB_names: list, source: str = "paste") -> Attachment:
+    """Create the results Adaptive Card."""
+    body = _result_card_body(analysis_result, docA_name, docB_names)
     
     actions = []
     
@@ -352,9 +419,7 @@ def get_result_card(analysis_result: str, docA_name: str, docB_names: list, sour
     })
     
     card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
+        **_CARD_HEADER,
         "body": body,
         "actions": actions
     }
@@ -362,12 +427,17 @@ def get_result_card(analysis_result: str, docA_name: str, docB_names: list, sour
 
 
 
-def get_error_card(error_message: str) -> Attachment:
-    """Create the error Adaptive Card."""
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
+@lru_cache(maxsize=32)
+def _error_card_dict(error_message: str) -> dict:
+    """Error card dict; shared by both variants.
+
+    Bounded cache: the error-message vocabulary is small and recurring
+    (size limits, unsupported formats, analysis failures), so repeats
+    become a hash lookup. Sharing the dict is safe for the same
+    copy-on-write reason as the other cached builders.
+    """
+    return {
+        **_CARD_HEADER,
         "body": [
             {
                 "type": "TextBlock",
@@ -392,68 +462,28 @@ def get_error_card(error_message: str) -> Attachment:
             }
         ]
     }
-    return CardFactory.adaptive_card(card)
+
+
+def get_error_card(error_message: str) -> Attachment:
+    """Create the error Adaptive Card."""
+    return CardFactory.adaptive_card(_error_card_dict(error_message))
 
 
 # =============================================================================
 # COMPLETED CARDS (SAME content as original, NO buttons)
 # =============================================================================
 
+# Derived from the active card: identical body, no buttons.
+_WELCOME_CARD_COMPLETED = _strip_actions(_WELCOME_CARD)
+
+
 def get_welcome_card_completed() -> Attachment:
     """Completed welcome card - same content, no buttons."""
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
-        "body": [
-            {
-                "type": "TextBlock",
-                "text": "Gap Analysis Agent",
-                "weight": "Bolder",
-                "size": "Large",
-                "wrap": True
-            },
-            {
-                "type": "TextBlock",
-                "text": "Compare two documents to identify gaps, mismatches, or missing elements.",
-                "wrap": True,
-                "spacing": "Small"
-            },
-            {
-                "type": "ColumnSet",
-                "spacing": "Medium",
-                "columns": [
-                    {
-                        "type": "Column",
-                        "width": "stretch",
-                        "items": [
-                            {
-                                "type": "TextBlock",
-                                "text": "**Document A** = Source / Current state",
-                                "wrap": True
-                            },
-                            {
-                                "type": "TextBlock",
-                                "text": "**Document B** = Target / Requirements",
-                                "wrap": True,
-                                "spacing": "Small"
-                            }
-                        ]
-                    }
-                ]
-            }
-        ]
-        # NO actions
-    }
-    return CardFactory.adaptive_card(card)
+    return CardFactory.adaptive_card(_WELCOME_CARD_COMPLETED)
 
 
-def get_docA_upload_card_completed() -> Attachment:
-    """Completed Document A upload card - same content, no buttons."""
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
+_DOCA_UPLOAD_CARD_COMPLETED = {
+        **_CARD_HEADER,
         "body": [
             {
                 "type": "TextBlock",
@@ -478,15 +508,17 @@ def get_docA_upload_card_completed() -> Attachment:
         ]
         # NO actions
     }
-    return CardFactory.adaptive_card(card)
+
+
+def get_docA_upload_card_completed() -> Attachment:
+    """Completed Document A upload card - same content, no buttons."""
+    return CardFactory.adaptive_card(_DOCA_UPLOAD_CARD_COMPLETED)
 
 
 def get_text_input_card_completed(docA: str = "", docB: str = "", objective: str = "") -> Attachment:
     """Completed text input card - shows what user entered as TextBlocks, no input fields or buttons."""
     card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
+        **_CARD_HEADER,
         "body": [
             {
                 "type": "TextBlock",
@@ -539,51 +571,13 @@ def get_text_input_card_completed(docA: str = "", docB: str = "", objective: str
 
 def get_docA_received_card_completed(filename: str) -> Attachment:
     """Completed Document A received card - same content, no buttons."""
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
-        "body": [
-            {
-                "type": "TextBlock",
-                "text": "Document A Received",
-                "weight": "Bolder",
-                "size": "Medium",
-                "color": "Good",
-                "wrap": True
-            },
-            {
-                "type": "TextBlock",
-                "text": f"File: {filename}",
-                "wrap": True,
-                "spacing": "Small"
-            },
-            {
-                "type": "TextBlock",
-                "text": "Now attach Document B",
-                "weight": "Bolder",
-                "spacing": "Medium",
-                "wrap": True
-            },
-            {
-                "type": "TextBlock",
-                "text": "Attach your target/requirements document(s).",
-                "wrap": True,
-                "spacing": "Small",
-                "isSubtle": True
-            }
-        ]
-        # NO actions
-    }
-    return CardFactory.adaptive_card(card)
+    return CardFactory.adaptive_card(_strip_actions(_docA_received_card_dict(filename)))
 
 
 def get_docB_received_card_completed(filename: str, objective: str = "") -> Attachment:
     """Completed Document B received card - shows confirmed file and objective."""
     card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
+        **_CARD_HEADER,
         "body": [
             {
                 "type": "TextBlock",
@@ -595,7 +589,7 @@ def get_docB_received_card_completed(filename: str, objective: str = "") -> Atta
             },
             {
                 "type": "TextBlock",
-                "text": f"File: {filename}",
+                "text": "File: " + filename,
                 "wrap": True,
                 "spacing": "Small"
             },
@@ -621,40 +615,9 @@ def get_docB_received_card_completed(filename: str, objective: str = "") -> Atta
 
 def get_result_card_completed(analysis_result: str, docA_name: str, docB_names: list) -> Attachment:
     """Completed result card - same content, no buttons."""
-    docB_display = ", ".join(docB_names) if docB_names else "Document B"
-    
     card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
-        "body": [
-            {
-                "type": "TextBlock",
-                "text": "Gap Analysis Results",
-                "weight": "Bolder",
-                "size": "Large",
-                "wrap": True
-            },
-            {
-                "type": "FactSet",
-                "spacing": "Small",
-                "facts": [
-                    {"title": "Source (A):", "value": docA_name},
-                    {"title": "Target (B):", "value": docB_display}
-                ]
-            },
-            {
-                "type": "TextBlock",
-                "text": "---",
-                "spacing": "Small"
-            },
-            {
-                "type": "TextBlock",
-                "text": analysis_result,
-                "wrap": True,
-                "spacing": "Small"
-            }
-        ]
+        **_CARD_HEADER,
+        "body": _result_card_body(analysis_result, docA_name, docB_names, factset_spacing="Small")
         # NO actions
     }
     return CardFactory.adaptive_card(card)
@@ -662,26 +625,4 @@ def get_result_card_completed(analysis_result: str, docA_name: str, docB_names:
 
 def get_error_card_completed(error_message: str) -> Attachment:
     """Completed error card - same content, no buttons."""
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.4",
-        "body": [
-            {
-                "type": "TextBlock",
-                "text": "Error",
-                "weight": "Bolder",
-                "size": "Medium",
-                "color": "Attention",
-                "wrap": True
-            },
-            {
-                "type": "TextBlock",
-                "text": error_message,
-                "wrap": True,
-                "spacing": "Small"
-            }
-        ]
-        # NO actions
-    }
-    return CardFactory.adaptive_card(card)
+    return CardFactory.adaptive_card(_strip_actions(_error_card_dict(error_message)))
@@ -38,11 +38,17 @@ class Config:
     
     # Server settings
     PORT = int(os.getenv("PORT", 3978))
+
+    # State storage settings
+    # Empty = in-memory storage (single process, local dev only)
+    REDIS_URL = os.getenv("REDIS_URL", "")
     
     # Azure OpenAI settings
     AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT", "")
     AZURE_OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY", "")
     AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini")
+    # Optional lighter deployment for short inputs (empty = always use the main one)
+    AZURE_OPENAI_DEPLOYMENT_SMALL = os.getenv("AZURE_OPENAI_DEPLOYMENT_SMALL", "")
     AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-06-01")
     
     @classmethod
@@ -1,18 +1,72 @@
 """File handling utilities for extracting text from documents."""
+import asyncio
+import hashlib
 import io
 import httpx
 import logging
 from typing import Optional
 
+from .cache import ResultCache
+
 logger = logging.getLogger(__name__)
 
+# Extracted text keyed by attachment URL. Teams content URLs identify one
+# uploaded blob, so a re-sent or re-processed attachment can skip the
+# download and parse entirely.
+_text_cache = ResultCache("gap:filetext")
+
+
+def _attachment_cache_key(url: str) -> str:
+    """Cache key for an attachment URL (hashed: URLs are long and contain PII)."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
 
 class FileHandler:
     """Handles downloading and extracting text from various file formats."""
     
     SUPPORTED_EXTENSIONS = {'.txt', '.pdf', '.docx', '.doc'}
+    # Tuple form of the same suffixes for the str.endswith fast path.
+    _SUPPORTED_SUFFIXES = ('.txt', '.pdf', '.docx', '.doc')
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
-    
+
+    # Shared AsyncClient so downloads reuse pooled connections (and TLS
+    # handshakes) instead of paying connection setup per attachment.
+    _client: Optional[httpx.AsyncClient] = None
+
+    # Outbound connection pool tuning: enough parallel connections to cover
+    # a max-size multi-file upload, with keep-alives held long enough to
+    # span a whole conversation turn against SharePoint/Graph.
+    POOL_LIMITS = httpx.Limits(
+        max_connections=20,
+        max_keepalive_connections=10,
+        keepalive_expiry=30.0,
+    )
+
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it lazily on first use."""
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(timeout=60.0, limits=cls.POOL_LIMITS)
+        return cls._client
+
+    # Shared MSAL app: its in-memory token cache makes acquire_token_silent
+    # a hit on every download after the first, instead of a fresh AAD round
+    # trip per file.
+    _msal_app = None
+
+    @classmethod
+    def _get_msal_app(cls):
+        """Get the shared MSAL confidential client, creating it lazily."""
+        if cls._msal_app is None:
+            from msal import ConfidentialClientApplication
+            from src.config import Config
+            cls._msal_app = ConfidentialClientApplication(
+                client_id=Config.APP_ID,
+                client_credential=Config.APP_PASSWORD,
+                authority=f"https://login.microsoftonline.com/{Config.APP_TENANT_ID}"
+            )
+        return cls._msal_app
+
     @staticmethod
     def get_file_extension(filename: str) -> str:
         """Get lowercase file extension."""
@@ -23,20 +77,48 @@ class FileHandler:
     @staticmethod
     def is_supported(filename: str) -> bool:
         """Check if file type is supported."""
-        ext = FileHandler.get_file_extension(filename)
-        return ext in FileHandler.SUPPORTED_EXTENSIONS
+        # endswith with a suffix tuple checks all extensions in one C call,
+        # without slicing the extension out first.
+        return filename.lower().endswith(FileHandler._SUPPORTED_SUFFIXES)
     
+    # Streaming read granularity for downloads.
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+    @staticmethod
+    async def _read_response_limited(response) -> bytes:
+        """Accumulate a streamed response body, enforcing MAX_FILE_SIZE.
+
+        Aborts as soon as the declared or accumulated size crosses the
+        limit, so an oversized upload costs at most MAX_FILE_SIZE of
+        transfer and memory instead of the full file.
+        """
+        declared = response.headers.get("content-length")
+        if declared and int(declared) > FileHandler.MAX_FILE_SIZE:
+            raise ValueError(
+                f"File too large: {int(declared) / 1024 / 1024:.1f} MB. "
+                f"Maximum size is {FileHandler.MAX_FILE_SIZE / 1024 / 1024:.0f} MB."
+            )
+        buffer = bytearray()
+        async for chunk in response.aiter_bytes(FileHandler.DOWNLOAD_CHUNK_SIZE):
+            buffer += chunk
+            if len(buffer) > FileHandler.MAX_FILE_SIZE:
+                raise ValueError(
+                    f"File too large: exceeds the "
+                    f"{FileHandler.MAX_FILE_SIZE / 1024 / 1024:.0f} MB maximum."
+                )
+        return bytes(buffer)
+
     @staticmethod
     async def download_file(url: str, auth_token: Optional[str] = None) -> bytes:
         """Download file from URL."""
         headers = {}
         if auth_token:
             headers['Authorization'] = f'Bearer {auth_token}'
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, follow_redirects=True)
+
+        client = FileHandler._get_client()
+        async with client.stream("GET", url, headers=headers, follow_redirects=True) as response:
             response.raise_for_status()
-            return response.content
+            return await FileHandler._read_response_limited(response)
 
     @staticmethod
     async def download_file_with_bot_credentials(url: str) -> bytes:
@@ -47,24 +129,18 @@ class FileHandler:
         API permissions with admin consent for this to work.
         """
         try:
-            from msal import ConfidentialClientApplication
             from src.config import Config
             import re
             import urllib.parse
-            
+
             # SharePoint files require Graph API access
-            authority = f"https://login.microsoftonline.com/{Config.APP_TENANT_ID}"
             scope = ["https://graph.microsoft.com/.default"]
-            
+
             logger.info(f"Attempting Graph API token acquisition for tenant: {Config.APP_TENANT_ID}")
-            
-            # Create MSAL app for client credentials flow
-            msal_app = ConfidentialClientApplication(
-                client_id=Config.APP_ID,
-                client_credential=Config.APP_PASSWORD,
-                authority=authority
-            )
-            
+
+            # Shared MSAL app (client credentials flow) with a warm token cache
+            msal_app = FileHandler._get_msal_app()
+
             # Acquire token using client credentials (app-only)
             result = msal_app.acquire_token_silent(scope, account=None)
             if not result:
@@ -83,74 +159,73 @@ class FileHandler:
                 'Accept': 'application/octet-stream'
             }
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                # Convert SharePoint URL to Graph API format
-                # Format: https://tenant-my.sharepoint.com/personal/user_domain/Documents/path/file.pdf
+            client = FileHandler._get_client()
+            # Convert SharePoint URL to Graph API format
+            # Format: https://tenant-my.sharepoint.com/personal/user_domain/Documents/path/file.pdf
+            
+            if "sharepoint.com" in url.lower():
+                logger.info(f"Converting SharePoint URL to Graph API format...")
                 
-                if "sharepoint.com" in url.lower():
-                    logger.info(f"Converting SharePoint URL to Graph API format...")
-                    
-                    # Extract hostname and path from URL
-                    parsed = urllib.parse.urlparse(url)
-                    hostname = parsed.netloc  # e.g., o365testlabca-my.sharepoint.com
-                    path = urllib.parse.unquote(parsed.path)  # Decode URL encoding
-                    
-                    logger.info(f"Hostname: {hostname}, Path: {path}")
-                    
-                    # For personal OneDrive URLs (contains -my.sharepoint.com)
-                    # Format: /personal/{user_folder}/Documents/{file_path}
-                    if "-my.sharepoint.com" in hostname:
-                        # Extract user folder and file path
-                        match = re.match(r'/personal/([^/]+)/Documents/(.+)$', path)
-                        if match:
-                            user_folder = match.group(1)  # e.g., testmaker2_o365testlab_ca
-                            file_path = match.group(2)    # e.g., Microsoft Teams Chat Files/file.pdf
-                            
-                            logger.info(f"OneDrive for Business - User: {user_folder}, File: {file_path}")
-                            
-                            # Use Graph API to get the site and drive
-                            # First, resolve the site  
-                            site_url = f"https://graph.microsoft.com/v1.0/sites/{hostname}:/personal/{user_folder}"
-                            logger.info(f"Resolving site: {site_url}")
+                # Extract hostname and path from URL
+                parsed = urllib.parse.urlparse(url)
+                hostname = parsed.netloc  # e.g., o365testlabca-my.sharepoint.com
+                path = urllib.parse.unquote(parsed.path)  # Decode URL encoding
+                
+                logger.info(f"Hostname: {hostname}, Path: {path}")
+                
+                # For personal OneDrive URLs (contains -my.sharepoint.com)
+                # Format: /personal/{user_folder}/Documents/{file_path}
+                if "-my.sharepoint.com" in hostname:
+                    # Extract user folder and file path
+                    match = re.match(r'/personal/([^/]+)/Documents/(.+)$', path)
+                    if match:
+                        user_folder = match.group(1)  # e.g., testmaker2_o365testlab_ca
+                        file_path = match.group(2)    # e.g., Microsoft Teams Chat Files/file.pdf
+                        
+                        logger.info(f"OneDrive for Business - User: {user_folder}, File: {file_path}")
+                        
+                        # Use Graph API to get the site and drive
+                        # First, resolve the site  
+                        site_url = f"https://graph.microsoft.com/v1.0/sites/{hostname}:/personal/{user_folder}"
+                        logger.info(f"Resolving site: {site_url}")
+                        
+                        site_response = await client.get(site_url, headers={'Authorization': f'Bearer {token}'})
+                        
+                        if site_response.status_code == 200:
+                            site_data = site_response.json()
+                            site_id = site_data.get("id")
+                            logger.info(f"Site resolved, ID: {site_id}")
                             
-                            site_response = await client.get(site_url, headers={'Authorization': f'Bearer {token}'})
+                            # Now get the file content via drive
+                            file_download_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{file_path}:/content"
+                            logger.info(f"Downloading via: {file_download_url}")
                             
-                            if site_response.status_code == 200:
-                                site_data = site_response.json()
-                                site_id = site_data.get("id")
-                                logger.info(f"Site resolved, ID: {site_id}")
-                                
-                                # Now get the file content via drive
-                                file_download_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{file_path}:/content"
-                                logger.info(f"Downloading via: {file_download_url}")
-                                
-                                file_response = await client.get(file_download_url, headers=headers, follow_redirects=True)
+                            async with client.stream("GET", file_download_url, headers=headers, follow_redirects=True) as file_response:
                                 file_response.raise_for_status()
-                                return file_response.content
-                            else:
-                                logger.warning(f"Site resolution failed: {site_response.status_code} - {site_response.text[:200]}")
-                    
-                    # For regular SharePoint sites
-                    else:
-                        # Try to resolve via shares API using sharing URL
-                        # Encode the URL for the shares endpoint
-                        import base64
-                        encoded_url = base64.urlsafe_b64encode(url.encode()).decode().rstrip('=')
-                        shares_url = f"https://graph.microsoft.com/v1.0/shares/u!{encoded_url}/driveItem/content"
-                        
-                        logger.info(f"Trying shares API: {shares_url}")
-                        
-                        shares_response = await client.get(shares_url, headers=headers, follow_redirects=True)
-                        if shares_response.status_code == 200:
-                            return shares_response.content
+                                return await FileHandler._read_response_limited(file_response)
                         else:
-                            logger.warning(f"Shares API failed: {shares_response.status_code}")
+                            logger.warning(f"Site resolution failed: {site_response.status_code} - {site_response.text[:200]}")
                 
-                # Fallback: try direct URL (might work for some configurations)
-                response = await client.get(url, headers=headers, follow_redirects=True)
+                # For regular SharePoint sites
+                else:
+                    # Try to resolve via shares API using sharing URL
+                    # Encode the URL for the shares endpoint
+                    import base64
+                    encoded_url = base64.urlsafe_b64encode(url.encode()).decode().rstrip('=')
+                    shares_url = f"https://graph.microsoft.com/v1.0/shares/u!{encoded_url}/driveItem/content"
+                    
+                    logger.info(f"Trying shares API: {shares_url}")
+                    
+                    async with client.stream("GET", shares_url, headers=headers, follow_redirects=True) as shares_response:
+                        if shares_response.status_code == 200:
+                            return await FileHandler._read_response_limited(shares_response)
+                        logger.warning(f"Shares API failed: {shares_response.status_code}")
+            
+            # Fallback: try direct URL (might work for some configurations)
+            async with client.stream("GET", url, headers=headers, follow_redirects=True) as response:
                 response.raise_for_status()
-                return response.content
-                
+                return await FileHandler._read_response_limited(response)
+            
         except Exception as e:
             logger.error(f"Failed to download with Graph API: {e}")
             # Fallback: try without authentication (for public URLs or testing)
@@ -247,15 +322,18 @@ class FileHandler:
                 f"Supported: PDF, Word (.docx), Text (.txt)"
             )
         
+        cache_key = _attachment_cache_key(url)
+        cached = await _text_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         content = await FileHandler.download_file(url, auth_token)
-        
-        if len(content) > FileHandler.MAX_FILE_SIZE:
-            raise ValueError(
-                f"File too large: {len(content) / 1024 / 1024:.1f} MB. "
-                f"Maximum size is {FileHandler.MAX_FILE_SIZE / 1024 / 1024:.0f} MB."
-            )
-        
-        return FileHandler.extract_text(content, filename)
+
+        # PDF/DOCX parsing is CPU-bound; run it in a worker thread so a big
+        # document doesn't stall every other conversation on the event loop.
+        text = await asyncio.to_thread(FileHandler.extract_text, content, filename)
+        await _text_cache.set(cache_key, text)
+        return text
 
     @staticmethod
     async def process_attachment_with_bot_credentials(url: str, filename: str) -> str:
@@ -270,12 +348,14 @@ class FileHandler:
                 f"Supported: PDF, Word (.docx), Text (.txt)"
             )
         
+        cache_key = _attachment_cache_key(url)
+        cached = await _text_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         content = await FileHandler.download_file_with_bot_credentials(url)
-        
-        if len(content) > FileHandler.MAX_FILE_SIZE:
-            raise ValueError(
-                f"File too large: {len(content) / 1024 / 1024:.1f} MB. "
-                f"Maximum size is {FileHandler.MAX_FILE_SIZE / 1024 / 1024:.0f} MB."
-            )
-        
-        return FileHandler.extract_text(content, filename)
+
+        # Parse off the event loop for the same reason as process_attachment.
+        text = await asyncio.to_thread(FileHandler.extract_text, content, filename)
+        await _text_cache.set(cache_key, text)
+        return text
@@ -0,0 +1,120 @@
+"""Redis-backed Storage implementation for bot conversation/user state.
+
+MemoryStorage keeps state in one process's heap, which breaks down as soon
+as the bot runs behind multiple Gunicorn workers or gets restarted. Storing
+state in Redis lets every worker and replica share the same session data
+and survive restarts.
+"""
+from typing import Dict, List
+
+from botbuilder.core import Storage
+
+from .logger import setup_logger
+from .serialization import json_dumps as _json_dumps, json_loads as _json_loads
+
+LOGGER = setup_logger(__name__)
+
+# Keys expire after 24h so abandoned conversations don't accumulate forever.
+STATE_TTL_SECONDS = 86400
+KEY_PREFIX = "bot:state:"
+
+# 1-byte payload magic so the wire format can evolve without flag days.
+MAGIC_RAW = b"\x00"   # plain serialized JSON
+MAGIC_ZSTD = b"\x01"  # zstd-compressed serialized JSON
+
+# Payloads below this size rarely benefit from compression.
+COMPRESS_MIN_BYTES = 512
+
+
+def _dumps(obj) -> bytes:
+    """Serialize and, when worthwhile, zstd-compress a state dict.
+
+    Session state carries the full extracted text of both documents, so
+    payloads easily reach hundreds of KB; compressing them roughly halves
+    the bytes shipped to Redis on every turn.
+    """
+    raw = _json_dumps(obj)
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        try:
+            import zstandard
+            return MAGIC_ZSTD + zstandard.ZstdCompressor(level=3).compress(raw)
+        except ImportError:
+            pass
+    return MAGIC_RAW + raw
+
+
+def _loads(data: bytes):
+    """Deserialize a payload written by _dumps, honoring the magic prefix."""
+    magic, payload = data[:1], data[1:]
+    if magic == MAGIC_ZSTD:
+        import zstandard
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif magic != MAGIC_RAW:
+        # Pre-versioning payload written before the magic byte existed.
+        payload = data
+    return _json_loads(payload)
+
+
+class RedisStorage(Storage):
+    """botbuilder Storage backed by Redis (read/write/delete)."""
+
+    def __init__(self, redis_url: str, pool_size: int = 16):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as e:
+            raise ImportError(
+                "redis is required for RedisStorage. "
+                "Install it with: pip install redis"
+            ) from e
+
+        # BlockingConnectionPool waits for a free connection instead of
+        # erroring out under burst load. Size ~2x worker count is plenty.
+        pool = aioredis.BlockingConnectionPool.from_url(
+            redis_url, max_connections=pool_size
+        )
+        self._redis = aioredis.Redis(connection_pool=pool)
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"{KEY_PREFIX}{key}"
+
+    async def read(self, keys: List[str]) -> Dict[str, object]:
+        """Read state objects for the given keys. Missing keys are omitted."""
+        if not keys:
+            return {}
+
+        # Pipeline multi-key reads so N keys cost one round trip, not N.
+        pipe = self._redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(self._key(key))
+        values = await pipe.execute()
+
+        result = {}
+        for key, raw in zip(keys, values):
+            if raw is None:
+                continue
+            try:
+                result[key] = _loads(raw)
+            except Exception as e:
+                LOGGER.warning(f"Discarding unreadable state for {key}: {e}")
+        return result
+
+    async def write(self, changes: Dict[str, object]):
+        """Write state objects, refreshing the TTL on every write."""
+        if not changes:
+            return
+
+        pipe = self._redis.pipeline(transaction=False)
+        for key, value in changes.items():
+            # eTag-based concurrency isn't meaningful with last-write-wins
+            # Redis semantics; store the payload as-is.
+            if isinstance(value, dict):
+                value = {k: v for k, v in value.items() if k != "e_tag"}
+            pipe.set(self._key(key), _dumps(value), ex=STATE_TTL_SECONDS)
+        await pipe.execute()
+
+    async def delete(self, keys: List[str]):
+        """Delete state objects for the given keys."""
+        if not keys:
+            return
+        await self._redis.delete(*[self._key(k) for k in keys])
@@ -0,0 +1,28 @@
+"""Fast JSON helpers shared by the state and card hot paths.
+
+orjson is an order of magnitude faster than stdlib json for the dict
+payloads this bot shuttles around (state blobs, Adaptive Card content).
+These wrappers use it when installed and fall back to stdlib json so the
+bot still runs in minimal environments.
+"""
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+import json as _json
+
+
+def json_dumps(obj) -> bytes:
+    """Serialize obj to JSON bytes."""
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return _json.dumps(obj).encode("utf-8")
+
+
+def json_loads(data):
+    """Deserialize JSON from bytes or str."""
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return _json.loads(data)